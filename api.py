@@ -2,6 +2,7 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from utils import analyze_company_news, format_output
+from windowed_sentiment import DEFAULT_TOKEN_BUDGET
 import uvicorn
 
 app = FastAPI(
@@ -18,13 +19,16 @@ class AnalysisResponse(BaseModel):
     final_sentiment_analysis: str
 
 @app.get("/analyze/{company_name}", response_model=AnalysisResponse)
-async def analyze_company(company_name: str, num_articles: int = 10):
+async def analyze_company(company_name: str, num_articles: int = 10, full_text: bool = False,
+                          token_budget: int = DEFAULT_TOKEN_BUDGET):
     """
     Analyze news sentiment for a given company.
 
     Args:
         company_name (str): Name of the company to analyze.
         num_articles (int, optional): Number of articles to fetch (default: 10, max: 20).
+        full_text (bool, optional): Score full article text instead of the summary (default: False).
+        token_budget (int, optional): Maximum tokens scored in full-text mode (default: 8192, max: 32768).
 
     Returns:
         dict: Structured JSON response with analysis results.
@@ -38,9 +42,12 @@ async def analyze_company(company_name: str, num_articles: int = 10):
     if num_articles < 1 or num_articles > 20:
         raise HTTPException(status_code=400, detail="Number of articles must be between 1 and 20.")
     
+    if token_budget < 512 or token_budget > 32768:
+        raise HTTPException(status_code=400, detail="Token budget must be between 512 and 32768.")
+    
     try:
         # Perform analysis using utility functions
-        results = analyze_company_news(company_name, num_articles)
+        results = analyze_company_news(company_name, num_articles, full_text, token_budget)
         if not results or not results.get("articles"):
             raise HTTPException(status_code=404, detail=f"No valid news articles found for {company_name}.")
         
@@ -8,6 +8,9 @@ import time
 import random
 import spacy
 from transformers import pipeline
+from host_index import HostIndex, host_outcome
+from result_cache import ResultCache, show_analysis
+from windowed_sentiment import DEFAULT_TOKEN_BUDGET, score_full_texts
 
 from transformers import pipeline
 
@@ -50,7 +53,21 @@ def load_spacy_model():
 
 nlp = load_spacy_model()
 
-def search_company_news(company_name, num_articles=10):
+# Per-host fetch statistics, shared by all sessions and persisted to disk
+@st.cache_resource
+def load_host_index():
+    return HostIndex()
+
+host_index = load_host_index()
+
+# Per-company analysis results with a TTL, shared by all sessions
+@st.cache_resource
+def load_result_cache():
+    return ResultCache()
+
+result_cache = load_result_cache()
+
+def search_company_news(company_name, num_articles=10, notify=st):
     search_query = f"{company_name} company news -inurl:(subscription login signup)"  # Exclude subscription/login pages
     url = f"https://www.google.com/search?q={search_query}&tbm=nws"
     
@@ -62,7 +79,7 @@ def search_company_news(company_name, num_articles=10):
     try:
         response = requests.get(url, headers=headers, timeout=10)
         if response.status_code != 200:
-            st.error(f"Failed to fetch page: {response.status_code}")
+            notify.error(f"Failed to fetch page: {response.status_code}")
             return []
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -92,24 +109,44 @@ def search_company_news(company_name, num_articles=10):
         
         return articles[:num_articles]
     except Exception as e:
-        st.error(f"Error searching for news: {str(e)}")
+        notify.error(f"Error searching for news: {str(e)}")
         return []
 
 def extract_article_content(url, company_name):
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.6998.89 Safari/537.36",
+        "Referer": "https://www.google.com/"
+    }
+    
+    # Time the fetch and the parse separately so the host index can rank hosts
+    start = time.perf_counter()
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.6998.89 Safari/537.36",
-            "Referer": "https://www.google.com/"
-        }
-        
         response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    except Exception as e:
+        host_index.record(url, False, fetch_time=time.perf_counter() - start)
+        return {
+            'valid': False,
+            'reason': 'error',
+            'title': "Extraction Failed",
+            'text': "",
+            'summary': f"Error: {str(e)}"
+        }
+    fetch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    content = parse_article_content(response.text, company_name)
+    host_index.record(url, host_outcome(content), fetch_time, time.perf_counter() - start)
+    return content
+
+def parse_article_content(html, company_name):
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
         
         title = soup.title.text.strip() if soup.title else "Unknown Title"
         
         skip_phrases = ["access denied", "just a moment", "cloudflare", "captcha", "403 forbidden", "subscribe now", "log in", "sign up"]
         if any(phrase in title.lower() for phrase in skip_phrases):
-            return {'valid': False}
+            return {'valid': False, 'reason': 'blocked'}
         
         # Enhanced content extraction
         article_content = None
@@ -123,15 +160,22 @@ def extract_article_content(url, company_name):
                 article_content = container
                 break
         
+        long_paragraphs = [p for p in soup.find_all('p') if len(p.text.strip()) > 50]
         if not article_content:
-            paragraphs = [p for p in soup.find_all('p') if len(p.text.strip()) > 50 and company_name.lower() in p.text.lower()]
+            paragraphs = [p for p in long_paragraphs if company_name.lower() in p.text.lower()]
         else:
             paragraphs = article_content.find_all('p')
         
         text = ' '.join([p.text.strip() for p in paragraphs if not any(phrase in p.text.lower() for phrase in skip_phrases)])
         
-        if len(text.strip()) < 150 or company_name.lower() not in text.lower():  # Ensure company relevance
-            return {'valid': False}
+        if len(text.strip()) < 150:
+            # Without a container, paragraphs were filtered by company, so short text may just mean irrelevant
+            if not article_content and len(' '.join(p.text.strip() for p in long_paragraphs)) >= 150:
+                return {'valid': False, 'reason': 'irrelevant'}
+            return {'valid': False, 'reason': 'too_short'}
+        
+        if company_name.lower() not in text.lower():  # Ensure company relevance
+            return {'valid': False, 'reason': 'irrelevant'}
         
         sentences = re.split(r'(?<=[.!?])\s+', text)
         # Prioritize sentences mentioning the company
@@ -154,6 +198,7 @@ def extract_article_content(url, company_name):
     except Exception as e:
         return {
             'valid': False,
+            'reason': 'error',
             'title': "Extraction Failed",
             'text': "",
             'summary': f"Error: {str(e)}"
@@ -165,6 +210,9 @@ def analyze_sentiment(text):
     
     # Analyze with BERT
     result = sentiment_analyzer(text[:512])[0]  # Truncate to 512 tokens
+    return sentiment_from_result(result, text)
+
+def sentiment_from_result(result, text=None):
     label = result['label'].lower()
     score = result['score']
     
@@ -176,6 +224,10 @@ def analyze_sentiment(text):
     else:
         sentiment = {'compound': 0, 'pos': 0, 'neg': 0, 'neu': 1, 'label': 'neutral'}
     
+    # Window-aggregated full-text scores skip this; keyword hits are near-certain in whole articles
+    if text is None:
+        return sentiment
+    
     # Context-based override for common misclassifications
     negative_keywords = ["outage", "problem", "issue", "blocked", "failed", "disruption", "revert"]
     positive_keywords = ["success", "restored", "improved", "launched", "growth"]
@@ -188,6 +240,11 @@ def analyze_sentiment(text):
     
     return sentiment
 
+def analyze_sentiment_full_text(texts, token_budget=DEFAULT_TOKEN_BUDGET):
+    # Score whole articles in overlapping 512-token windows, batched across articles
+    results = score_full_texts(sentiment_analyzer, texts, token_budget)
+    return [sentiment_from_result(result) if result else None for result in results]
+
 def compare_sentiment(articles):
     if not articles:
         return {'sentiment_distribution': {'positive': 0, 'neutral': 0, 'negative': 0}}
@@ -337,31 +394,50 @@ def format_output(company_name, articles):
         "Audio": "[Play Hindi Speech]"
     }
 
-def analyze_company_news(company_name, num_articles=10):
+def iter_company_news(company_name, num_articles=10, full_text=False, token_budget=DEFAULT_TOKEN_BUDGET, notify=st):
+    # Yield articles one at a time so the UI can render them as they finish
     articles_to_fetch = num_articles * 2
-    fetched_articles = search_company_news(company_name, articles_to_fetch)
+    fetched_articles = search_company_news(company_name, articles_to_fetch, notify)
     
     if not fetched_articles:
-        st.warning(f"No news articles found for {company_name}")
-        return None
+        notify.warning(f"No news articles found for {company_name}")
+        return
+    
+    # Try historically reliable, fast hosts first and skip ones that keep failing
+    fetched_articles = host_index.rank(fetched_articles)
     
     valid_articles = []
-    for article in fetched_articles:
-        if len(valid_articles) >= num_articles:
-            break
-        
-        time.sleep(random.uniform(0.5, 1.5))
-        content = extract_article_content(article['url'], company_name)
+    try:
+        for article in fetched_articles:
+            if len(valid_articles) >= num_articles:
+                break
+            
+            time.sleep(random.uniform(0.5, 1.5))
+            content = extract_article_content(article['url'], company_name)
+            
+            if content.get('valid', False):
+                article.update({
+                    'title': content['title'],
+                    'text': content['text'],
+                    'summary': content['summary'],
+                    'topics': extract_topics(content['summary'])
+                })
+                valid_articles.append(article)
+                if not full_text:
+                    article['sentiment'] = analyze_sentiment(article['summary'])
+                    yield article
         
-        if content.get('valid', False):
-            article.update({
-                'title': content['title'],
-                'text': content['text'],
-                'summary': content['summary'],
-                'topics': extract_topics(content['summary'])
-            })
-            article['sentiment'] = analyze_sentiment(article['summary'])
-            valid_articles.append(article)
+        if full_text and valid_articles:
+            # Batch windows from all articles together; fall back to the summary past the budget
+            sentiments = analyze_sentiment_full_text([article['text'] for article in valid_articles], token_budget)
+            for article, sentiment in zip(valid_articles, sentiments):
+                article['sentiment'] = sentiment or analyze_sentiment(article['summary'])
+                yield article
+    finally:
+        host_index.save()
+
+def analyze_company_news(company_name, num_articles=10, full_text=False, token_budget=DEFAULT_TOKEN_BUDGET):
+    valid_articles = list(iter_company_news(company_name, num_articles, full_text, token_budget))
     
     if not valid_articles:
         st.warning(f"No valid news articles found for {company_name}")
@@ -379,19 +455,28 @@ def main():
     
     company_name = st.text_input("Select a company:")
     num_articles = st.slider("Number of articles to analyze:", min_value=10, step=1)
+    full_text = st.checkbox("Analyze full article text (slower)")
+    
+    analyze_col, refresh_col = st.columns(2)
+    analyze = analyze_col.button("Analyze News")
+    refresh = refresh_col.button("Refresh Results")
     
-    if st.button("Analyze News"):
+    if analyze or refresh:
         if company_name:
-            with st.spinner(f"Searching for news about {company_name}..."):
-                results = analyze_company_news(company_name, num_articles)
-                
-                if results:
-                    st.success(f"Analysis completed for {company_name}! Found {len(results['articles'])} articles.")
-                    st.json(format_output(company_name, results['articles']))
-                else:
-                    st.error(f"No valid news articles found for {company_name}.")
+            st.session_state['analysis'] = (company_name, num_articles, full_text)
         else:
             st.warning("Please select a company.")
+    
+    # Keep showing the last analysis across reruns, but only scrape when a button was clicked
+    if 'analysis' in st.session_state:
+        name, count, full = st.session_state['analysis']
+        show_analysis(
+            result_cache, (name.strip().lower(), count, full), name, count,
+            analyze=lambda notify: iter_company_news(name, count, full, notify=notify),
+            finalize=lambda articles: format_output(name, articles),
+            refresh=refresh and bool(company_name),
+            start=(analyze or refresh) and bool(company_name)
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
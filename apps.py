@@ -1,6 +1,14 @@
 # app.py
 import streamlit as st
-from utils import analyze_company_news, format_output
+from result_cache import ResultCache, show_analysis
+from utils import iter_company_news, format_output
+
+@st.cache_resource
+def load_result_cache():
+    """Load the per-company result cache shared by all sessions."""
+    return ResultCache()
+
+result_cache = load_result_cache()
 
 def main():
     """Main function to run the Streamlit app."""
@@ -9,18 +17,26 @@ def main():
     company_name = st.text_input("Enter a company name:")
     num_articles = st.slider("Number of articles to analyze:", min_value=10, step=1)
     
-    if st.button("Analyze News"):
+    analyze_col, refresh_col = st.columns(2)
+    analyze = analyze_col.button("Analyze News")
+    refresh = refresh_col.button("Refresh Results")
+    
+    if analyze or refresh:
         if not company_name:
             st.warning("Please enter a company name.")
             return
-        
-        with st.spinner(f"Searching for news about {company_name}..."):
-            results = analyze_company_news(company_name, num_articles)
-            if results:
-                st.success(f"Analysis completed for {company_name}! Found {len(results['articles'])} articles.")
-                st.json(format_output(company_name, results['articles']))
-            else:
-                st.error(f"No valid news articles found for {company_name}.")
+        st.session_state['analysis'] = (company_name, num_articles)
+    
+    # Keep showing the last analysis across reruns, but only scrape when a button was clicked
+    if 'analysis' in st.session_state:
+        name, count = st.session_state['analysis']
+        show_analysis(
+            result_cache, (name.strip().lower(), count, False), name, count,
+            analyze=lambda notify: iter_company_news(name, count, notify=notify),
+            finalize=lambda articles: format_output(name, articles),
+            refresh=refresh,
+            start=analyze or refresh
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
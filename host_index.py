@@ -0,0 +1,131 @@
+# host_index.py
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+# Defaults for deciding when a host has failed often enough to be skipped
+MIN_ATTEMPTS = 5
+SKIP_SUCCESS_RATE = 0.1
+RETRY_AFTER_SECONDS = 24 * 60 * 60
+HISTORY_SIZE = 20
+
+def get_host(url):
+    """Return the normalized host name of a URL."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def host_outcome(content):
+    """Map an extraction result to a host outcome; None when the host is not to blame."""
+    if content.get('valid', False):
+        return True
+    return None if content.get('reason') == 'irrelevant' else False
+
+class HostIndex:
+    """Persisted per-host fetch statistics used to rank candidate article URLs."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("HOST_INDEX_PATH", "host_index.json")
+        self.lock = threading.Lock()
+        self.hosts = self._load()
+        # Observations not yet written, merged into the file on save
+        self.pending = {}
+
+    def _load(self):
+        """Load host statistics from disk, starting empty if unavailable."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _append(stats, key, values):
+        stats[key] = (stats.get(key, []) + values)[-HISTORY_SIZE:]
+
+    def save(self):
+        """Merge new observations into the file on disk and write it atomically."""
+        with self.lock:
+            # Reload first so other processes sharing the file keep their statistics
+            merged = self._load()
+            for host, new in self.pending.items():
+                stats = merged.setdefault(host, {'outcomes': [], 'fetch_times': [], 'extract_times': []})
+                for key in ('outcomes', 'fetch_times', 'extract_times'):
+                    self._append(stats, key, new[key])
+                stats['last_attempt'] = max(stats.get('last_attempt', 0), new['last_attempt'])
+            self.hosts = merged
+
+            tmp_path = None
+            try:
+                # A unique temp file per writer, so concurrent saves never share one
+                with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(self.path)),
+                                                 prefix=".host_index.", suffix=".tmp", delete=False) as f:
+                    tmp_path = f.name
+                    json.dump(merged, f)
+                os.replace(tmp_path, self.path)
+                self.pending = {}
+            except OSError:
+                # Statistics are an optimization; never fail a request over them
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def record(self, url, success, fetch_time=None, extract_time=None):
+        """Record the outcome and timings of one article fetch; a success of None records timings only."""
+        host = get_host(url)
+        if not host:
+            return
+
+        outcome = None if success is None else int(success)
+        now = time.time()
+        with self.lock:
+            for target in (self.hosts, self.pending):
+                stats = target.setdefault(host, {'outcomes': [], 'fetch_times': [], 'extract_times': []})
+                stats['last_attempt'] = now
+                for key, value in (('outcomes', outcome), ('fetch_times', fetch_time), ('extract_times', extract_time)):
+                    if value is not None:
+                        self._append(stats, key, [round(value, 3)])
+
+    def host_stats(self, host):
+        """Return success rate and median timings for a host."""
+        with self.lock:
+            stats = self.hosts.get(host)
+            if not stats:
+                return {'attempts': 0, 'success_rate': None, 'median_fetch_time': None, 'median_extract_time': None}
+            outcomes = list(stats['outcomes'])
+            fetch_times = list(stats['fetch_times'])
+            extract_times = list(stats['extract_times'])
+
+        return {
+            'attempts': len(outcomes),
+            'success_rate': sum(outcomes) / len(outcomes) if outcomes else None,
+            'median_fetch_time': statistics.median(fetch_times) if fetch_times else None,
+            'median_extract_time': statistics.median(extract_times) if extract_times else None
+        }
+
+    def should_skip(self, url):
+        """Check whether a URL's host consistently fails and is not due for a retry."""
+        host = get_host(url)
+        stats = self.host_stats(host)
+        if stats['attempts'] < MIN_ATTEMPTS or stats['success_rate'] >= SKIP_SUCCESS_RATE:
+            return False
+
+        with self.lock:
+            last_attempt = self.hosts[host].get('last_attempt', 0)
+        return time.time() - last_attempt < RETRY_AFTER_SECONDS
+
+    def rank(self, articles):
+        """Drop articles from known-bad hosts and order the rest by expected success and speed."""
+        def sort_key(article):
+            stats = self.host_stats(get_host(article['url']))
+            # Laplace-smoothed success rate so unseen hosts sit between good and bad ones
+            successes = (stats['success_rate'] or 0) * stats['attempts']
+            expected_success = (successes + 1) / (stats['attempts'] + 2)
+            expected_time = (stats['median_fetch_time'] or 0) + (stats['median_extract_time'] or 0)
+            return (-expected_success, expected_time)
+
+        candidates = [article for article in articles if not self.should_skip(article['url'])]
+        return sorted(candidates, key=sort_key)
@@ -0,0 +1,158 @@
+# result_cache.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+
+# How long a finished analysis is reused before it is recomputed
+DEFAULT_TTL_SECONDS = 30 * 60
+# Empty or failed analyses (search blocked, nothing extracted) are retried much sooner
+EMPTY_TTL_SECONDS = 60
+MAX_ENTRIES = 100
+MAX_WORKERS = 4
+
+class AnalysisJob:
+    """Articles, messages and output of one analysis, shared by every session viewing it."""
+
+    def __init__(self):
+        self.articles = []
+        self.messages = []
+        self.output = None
+        self.done = False
+        self.finished_at = None
+        self.condition = threading.Condition()
+
+    def warning(self, message):
+        """Record a warning for sessions to display; mirrors st.warning."""
+        with self.condition:
+            self.messages.append(('warning', message))
+
+    def error(self, message):
+        """Record an error for sessions to display; mirrors st.error."""
+        with self.condition:
+            self.messages.append(('error', message))
+
+    def add(self, article):
+        """Append an analyzed article and wake up waiting sessions."""
+        with self.condition:
+            self.articles.append(article)
+            self.condition.notify_all()
+
+    def finish(self, output):
+        """Mark the analysis complete with its formatted output."""
+        with self.condition:
+            self.output = output
+            self.done = True
+            self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def wait(self, seen, timeout=1.0):
+        """Wait until more than `seen` articles exist or the job is done, then return a snapshot."""
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.articles) > seen or self.done, timeout)
+            return list(self.articles), self.done
+
+class ResultCache:
+    """Per-company analyses with a TTL, computed once by a worker pool shared across sessions."""
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, empty_ttl=EMPTY_TTL_SECONDS, max_entries=MAX_ENTRIES,
+                 max_workers=MAX_WORKERS):
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+        self.max_entries = max_entries
+        self.jobs = {}
+        self.lock = threading.Lock()
+        # Jobs run outside any session's script thread, so reruns never interrupt them
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-analysis")
+
+    def _expired(self, job):
+        ttl = self.ttl if job.output else self.empty_ttl
+        return job.done and time.time() - job.finished_at > ttl
+
+    def _evict(self):
+        """Drop expired jobs, then the oldest finished ones if over capacity."""
+        for key in [key for key, job in self.jobs.items() if self._expired(job)]:
+            del self.jobs[key]
+        finished = sorted((job.finished_at, key) for key, job in self.jobs.items() if job.done)
+        for _, key in finished[:max(len(self.jobs) - self.max_entries, 0)]:
+            del self.jobs[key]
+
+    @staticmethod
+    def _run(job, analyze, finalize):
+        """Collect articles from the analysis and finish the job, whatever happens."""
+        output = None
+        try:
+            for article in analyze(job):
+                job.add(article)
+            output = finalize(job.articles) if job.articles else None
+        except Exception as e:
+            job.error(f"Error analyzing news: {str(e)}")
+        finally:
+            job.finish(output)
+
+    def peek(self, key):
+        """Return the running or unexpired job for a key without starting one, or None."""
+        with self.lock:
+            self._evict()
+            return self.jobs.get(key)
+
+    def get(self, key, analyze, finalize, refresh=False):
+        """
+        Return the job for a key, starting it on the worker pool if needed.
+
+        `analyze(notify)` yields articles and reports problems through
+        `notify.warning`/`notify.error`; `finalize(articles)` builds the output.
+        A running job is always shared, even on refresh, so concurrent requests
+        for the same company never scrape twice. A finished job is reused until
+        its TTL expires or a refresh is requested.
+        """
+        with self.lock:
+            self._evict()
+            job = self.jobs.get(key)
+            if job and (not job.done or not refresh):
+                return job
+
+            job = AnalysisJob()
+            self.jobs[key] = job
+            self.executor.submit(self._run, job, analyze, finalize)
+            return job
+
+def render_articles(container, articles, shown):
+    """Render the articles that arrived since the last call."""
+    for article in articles[shown:]:
+        with container.expander(article['title']):
+            st.write(article['summary'])
+            st.caption(f"Sentiment: {article['sentiment']['label'].capitalize()} | Topics: {', '.join(article['topics'])}")
+    return len(articles)
+
+def show_analysis(cache, key, company_name, num_articles, analyze, finalize, refresh=False, start=True):
+    """
+    Render a shared analysis progressively; the session only displays what the job has produced.
+
+    With `start=False` (plain reruns) nothing is scraped: an expired or missing
+    result asks the user to refresh instead of silently recomputing it.
+    """
+    job = cache.get(key, analyze, finalize, refresh) if start else cache.peek(key)
+    if job is None:
+        st.info(f"Results for {company_name} have expired. Click Refresh Results to analyze again.")
+        return
+
+    progress = st.progress(0.0, text=f"Searching for news about {company_name}...")
+    container = st.container()
+
+    shown = 0
+    done = False
+    while not done:
+        articles, done = job.wait(shown)
+        shown = render_articles(container, articles, shown)
+        if shown:
+            progress.progress(min(shown / num_articles, 1.0), text=f"Analyzed {shown} of {num_articles} articles...")
+
+    progress.progress(1.0, text="Analysis complete.")
+    for level, message in job.messages:
+        getattr(st, level)(message)
+    if job.output:
+        st.success(f"Analysis completed for {company_name}! Found {len(job.articles)} articles.")
+        st.json(job.output)
+    else:
+        st.error(f"No valid news articles found for {company_name}.")
@@ -7,6 +7,8 @@ import random
 import spacy
 from transformers import pipeline
 import streamlit as st
+from host_index import HostIndex, host_outcome
+from windowed_sentiment import DEFAULT_TOKEN_BUDGET, score_full_texts
 
 # Initialize sentiment analysis model (SiEBERT)
 def load_sentiment_model():
@@ -22,12 +24,19 @@ def load_spacy_model():
 
 nlp = load_spacy_model()
 
+# Persisted per-host fetch statistics used to rank candidate URLs
+host_index = HostIndex()
+
 def analyze_sentiment(text):
     """Analyze sentiment of the given text using SiEBERT."""
     if not text or len(text.strip()) < 10:
         return {'compound': 0, 'pos': 0, 'neg': 0, 'neu': 0, 'label': 'neutral'}
     
     result = sentiment_analyzer(text[:512])[0]  # Truncate to 512 tokens
+    return sentiment_from_result(result)
+
+def sentiment_from_result(result):
+    """Map a SiEBERT label and confidence score to the sentiment format."""
     label = result['label'].lower()
     score = result['score']
     
@@ -43,8 +52,13 @@ def analyze_sentiment(text):
     
     return sentiment
 
-def search_company_news(company_name, num_articles=10):
-    """Search for company news articles on Google News."""
+def analyze_sentiment_full_text(texts, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Analyze sentiment of full article texts using sliding-window batching."""
+    results = score_full_texts(sentiment_analyzer, texts, token_budget)
+    return [sentiment_from_result(result) if result else None for result in results]
+
+def search_company_news(company_name, num_articles=10, notify=st):
+    """Search for company news articles on Google News, reporting problems through `notify`."""
     search_query = f"{company_name} company news -inurl:(subscription login signup)"
     url = f"https://www.google.com/search?q={search_query}&tbm=nws"
     headers = {
@@ -60,7 +74,7 @@ def search_company_news(company_name, num_articles=10):
         news_divs = soup.find_all('div', class_='SoaBEf')
         
         if not news_divs:
-            st.warning("No news articles found in Google News search results. Google may have changed its HTML structure.")
+            notify.warning("No news articles found in Google News search results. Google may have changed its HTML structure.")
             return []
         
         skip_titles = ["access denied", "just a moment", "captcha", "403 forbidden", "subscribe", "login"]
@@ -77,28 +91,42 @@ def search_company_news(company_name, num_articles=10):
                 articles.append({'title': headline, 'url': link})
         
         if not articles:
-            st.warning("No valid article URLs extracted from Google News.")
+            notify.warning("No valid article URLs extracted from Google News.")
         
         return articles[:num_articles]
     except Exception as e:
-        st.error(f"Error searching for news: {str(e)}")
+        notify.error(f"Error searching for news: {str(e)}")
         return []
 
 def extract_article_content(url, company_name):
-    """Extract article content from a given URL."""
+    """Extract article content from a given URL, recording host statistics."""
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Referer": "https://www.google.com/"
     }
     
+    start = time.perf_counter()
     try:
         response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    except Exception as e:
+        host_index.record(url, False, fetch_time=time.perf_counter() - start)
+        return {'valid': False, 'reason': 'error', 'title': "Extraction Failed", 'text': "", 'summary': f"Error: {str(e)}"}
+    fetch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    content = parse_article_content(response.text, company_name)
+    host_index.record(url, host_outcome(content), fetch_time, time.perf_counter() - start)
+    return content
+
+def parse_article_content(html, company_name):
+    """Parse article title, text and summary from fetched HTML."""
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
         title = soup.title.text.strip() if soup.title else "Unknown Title"
         
         skip_phrases = ["access denied", "just a moment", "captcha", "403 forbidden", "subscribe", "login"]
         if any(phrase in title.lower() for phrase in skip_phrases):
-            return {'valid': False}
+            return {'valid': False, 'reason': 'blocked'}
         
         article_content = next((container for container in [
             soup.find('article'),
@@ -113,10 +141,10 @@ def extract_article_content(url, company_name):
         
         # Relaxed validation: only require text length > 100 and company name in title or text
         if len(text.strip()) < 100:
-            return {'valid': False}
+            return {'valid': False, 'reason': 'too_short'}
         
         if company_name.lower() not in text.lower() and company_name.lower() not in title.lower():
-            return {'valid': False}
+            return {'valid': False, 'reason': 'irrelevant'}
         
         sentences = re.split(r'(?<=[.!?])\s+', text)
         company_sentences = [s for s in sentences if company_name.lower() in s.lower()]
@@ -129,7 +157,7 @@ def extract_article_content(url, company_name):
         
         return {'valid': True, 'title': title, 'text': text, 'summary': summary}
     except Exception as e:
-        return {'valid': False, 'title': "Extraction Failed", 'text': "", 'summary': f"Error: {str(e)}"}
+        return {'valid': False, 'reason': 'error', 'title': "Extraction Failed", 'text': "", 'summary': f"Error: {str(e)}"}
 
 def extract_topics(summary):
     """Extract topics from article summary using spaCy."""
@@ -214,30 +242,48 @@ def format_output(company_name, articles):
         "Final Sentiment Analysis": generate_final_sentiment(articles, company_name)
     }
 
-def analyze_company_news(company_name, num_articles=10):
-    """Main function to analyze company news."""
+def iter_company_news(company_name, num_articles=10, full_text=False, token_budget=DEFAULT_TOKEN_BUDGET, notify=st):
+    """Yield analyzed articles one at a time as each one finishes, reporting problems through `notify`."""
     articles_to_fetch = num_articles * 2
-    fetched_articles = search_company_news(company_name, articles_to_fetch)
+    fetched_articles = search_company_news(company_name, articles_to_fetch, notify)
     
     if not fetched_articles:
-        return None
+        return
+    
+    # Try historically reliable, fast hosts first and skip ones that keep failing
+    fetched_articles = host_index.rank(fetched_articles)
     
     valid_articles = []
-    for article in fetched_articles:
-        if len(valid_articles) >= num_articles:
-            break
-        
-        time.sleep(random.uniform(0.5, 1.5))  # Avoid rate limiting
-        content = extract_article_content(article['url'], company_name)
+    try:
+        for article in fetched_articles:
+            if len(valid_articles) >= num_articles:
+                break
+            
+            time.sleep(random.uniform(0.5, 1.5))  # Avoid rate limiting
+            content = extract_article_content(article['url'], company_name)
+            
+            if content.get('valid', False):
+                article.update({
+                    'title': content['title'],
+                    'text': content['text'],
+                    'summary': content['summary'],
+                    'topics': extract_topics(content['summary'])
+                })
+                valid_articles.append(article)
+                if not full_text:
+                    article['sentiment'] = analyze_sentiment(content['summary'])
+                    yield article
         
-        if content.get('valid', False):
-            article.update({
-                'title': content['title'],
-                'text': content['text'],
-                'summary': content['summary'],
-                'topics': extract_topics(content['summary']),
-                'sentiment': analyze_sentiment(content['summary'])
-            })
-            valid_articles.append(article)
-    
+        if full_text and valid_articles:
+            # Batch windows from all articles together; fall back to the summary past the budget
+            sentiments = analyze_sentiment_full_text([article['text'] for article in valid_articles], token_budget)
+            for article, sentiment in zip(valid_articles, sentiments):
+                article['sentiment'] = sentiment or analyze_sentiment(article['summary'])
+                yield article
+    finally:
+        host_index.save()
+
+def analyze_company_news(company_name, num_articles=10, full_text=False, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Main function to analyze company news, optionally scoring full article text."""
+    valid_articles = list(iter_company_news(company_name, num_articles, full_text, token_budget))
     return {'company_name': company_name, 'articles': valid_articles} if valid_articles else None
\ No newline at end of file
@@ -0,0 +1,98 @@
+# windowed_sentiment.py
+import torch
+
+# Default cap on tokens scored per request across all articles
+DEFAULT_TOKEN_BUDGET = 8192
+WINDOW_OVERLAP = 128
+BATCH_SIZE = 8
+
+def split_windows(token_ids, window_size, overlap=WINDOW_OVERLAP):
+    """Split token ids into overlapping windows of at most window_size tokens."""
+    if len(token_ids) <= window_size:
+        return [token_ids]
+
+    stride = max(window_size - overlap, 1)
+    starts = list(range(0, len(token_ids) - window_size, stride))
+    # Align the last window to the end instead of adding a short, mostly repeated tail,
+    # and drop it entirely when it would cover no more than `overlap` new tokens
+    if len(token_ids) - (starts[-1] + window_size) > overlap:
+        starts.append(len(token_ids) - window_size)
+    return [token_ids[start:start + window_size] for start in starts]
+
+def allocate_windows(article_windows, token_budget):
+    """
+    Pick windows round-robin across articles until the token budget is spent.
+
+    Once one of an article's windows does not fit, that article gets no further
+    windows, so every article is scored on a contiguous run from its start.
+    Leftover budget still goes to other articles' next windows.
+    """
+    selected = []
+    spent = 0
+    active = [index for index, windows in enumerate(article_windows) if windows]
+    depth = 0
+    while active:
+        for index in list(active):
+            window = article_windows[index][depth]
+            if spent + len(window) > token_budget:
+                active.remove(index)
+                continue
+            selected.append((index, window))
+            spent += len(window)
+        depth += 1
+        active = [index for index in active if depth < len(article_windows[index])]
+    return selected
+
+def score_full_texts(analyzer, texts, token_budget=DEFAULT_TOKEN_BUDGET, batch_size=BATCH_SIZE):
+    """
+    Score full article texts with a sentiment pipeline using sliding windows.
+
+    Each text is tokenized once and split into overlapping windows. Windows from
+    all texts are sorted by length and batched so padding stays minimal, and the
+    class probabilities of each text's windows are averaged, weighted by length.
+
+    Args:
+        analyzer: A Hugging Face text-classification pipeline.
+        texts (list): Article texts to score.
+        token_budget (int): Maximum number of tokens scored across all texts.
+        batch_size (int): Number of windows per inference batch.
+
+    Returns:
+        list: One pipeline-style {'label', 'score'} dict per text, or None for
+        texts that got no window within the budget.
+    """
+    tokenizer, model = analyzer.tokenizer, analyzer.model
+    window_size = min(tokenizer.model_max_length, 512) - tokenizer.num_special_tokens_to_add()
+
+    # Nothing past the budget can be scored, so avoid tokenizing it (generous 8 chars per token)
+    clipped = [(text or "")[:token_budget * 8] for text in texts]
+    token_ids = tokenizer(clipped, add_special_tokens=False, truncation=False)['input_ids']
+    article_windows = [split_windows(ids, window_size) if ids else [] for ids in token_ids]
+    selected = allocate_windows(article_windows, token_budget)
+
+    # Length-bucketed batching: neighbouring windows have similar lengths
+    selected.sort(key=lambda item: len(item[1]))
+    totals = [None] * len(texts)
+    weights = [0] * len(texts)
+    with torch.no_grad():
+        for start in range(0, len(selected), batch_size):
+            batch = selected[start:start + batch_size]
+            encoded = tokenizer.pad(
+                {'input_ids': [tokenizer.build_inputs_with_special_tokens(ids) for _, ids in batch]},
+                return_tensors="pt"
+            ).to(model.device)
+            probabilities = torch.softmax(model(**encoded).logits, dim=-1)
+            for (index, ids), probs in zip(batch, probabilities):
+                weighted = probs * len(ids)
+                totals[index] = weighted if totals[index] is None else totals[index] + weighted
+                weights[index] += len(ids)
+
+    results = []
+    for total, weight in zip(totals, weights):
+        if total is None:
+            results.append(None)
+            continue
+        probs = total / weight
+        label_id = int(probs.argmax())
+        results.append({'label': model.config.id2label[label_id], 'score': float(probs[label_id])})
+    return results